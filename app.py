@@ -1,10 +1,14 @@
 import pandas as pd
-import oracledb
 import streamlit as st
 from datetime import datetime, timedelta
 import numpy as np
+import os
 import time
 
+import fontes_dados
+import indice_busca
+import monitor_memoria
+
 # --- Configuração da página do Streamlit ---
 # Layout "wide" para ocupar a largura total e "collapsed" para esconder a sidebar, ideal para TV
 st.set_page_config(
@@ -14,81 +18,36 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# --- Configuração do Banco de Dados Oracle (Globais para fácil acesso) ---
-USERNAME = 'TASY'
-PASSWORD = 'aloisk'
-HOST = '10.250.250.190'
-PORT = 1521
-SERVICE = 'dbprod.santacasapc'
-
-# Inicializa o cliente Oracle Instant Client
-try:
-    oracledb.init_oracle_client()
-except Exception as e:
-    # Em um painel de TV, erros na sidebar não são ideais. Exibimos na tela principal.
-    st.error(f"Erro na inicialização do Oracle Instant Client: {e}. Verifique a configuração e as variáveis de ambiente.")
-
-# --- Funções de Conexão e Obtenção de Dados ---
-def criar_conexao(username, password, host, port, service):
-    """Cria e retorna uma nova conexão com o banco de dados Oracle."""
-    try:
-        # Tentativa 1: Usando DSN com formato padrão
-        conn = oracledb.connect(user=username, password=password,
-                               dsn=f"{host}:{port}/{service}")
-        return conn
-    except Exception as e:
-        # Erro de conexão exibido na tela principal do painel
-        st.error(f"Erro ao tentar conectar ao banco de dados: {e}. Verifique as credenciais e a conexão com o servidor.")
-        return None
+# --- Configurações de execução (sobrescritas por variáveis de ambiente) ---
+# A fonte de dados (Oracle, simulada ou reprodução de uma gravação) é escolhida em fontes_dados.py
+# Intervalo, em segundos, entre as atualizações automáticas do painel
+INTERVALO_ATUALIZACAO = float(os.environ.get('PY_MAN_INTERVALO_ATUALIZACAO', '30'))
 
+# --- Obtenção de Dados ---
 # Usando st.cache (compatível com versões mais antigas do Streamlit)
-# O `ttl=30` fará com que os dados sejam revalidados e atualizados a cada 30 segundos.
-@st.cache(allow_output_mutation=True, suppress_st_warning=True, ttl=30)
-def obter_ordens_servico(username, password, host, port, service):
-    """Obtém os dados das ordens de serviço do grupo de trabalho 12, criando uma nova conexão."""
-    conn = None
-    try:
-        conn = criar_conexao(username, password, host, port, service)
-        if conn is None:
-            return pd.DataFrame() # Retorna DataFrame vazio se a conexão falhar
-
-        query = """
-        select  nr_sequencia as nr_os,
-                ds_dano_breve as ds_solicitacao,
-                obter_nome_pf(cd_pessoa_solicitante) as nm_solicitante,
-                ie_prioridade,
-                dt_ordem_servico as dt_criacao,
-                dt_inicio_real as dt_inicio,
-                dt_fim_real as dt_termino,
-                nm_usuario as nm_responsavel,
-                ds_dano as ds_completa_servico
-        from    MAN_ORDEM_SERVICO
-        where   NR_GRUPO_TRABALHO = 12
-        """
-
-        df = pd.read_sql(query, conn)
-        return df
-    except Exception as e:
-        st.error(f"Erro ao executar consulta SQL: {e}. Verifique a query ou o acesso ao banco de dados.")
-        return pd.DataFrame()
-    finally:
-        if conn: # Garante que a conexão seja fechada se foi aberta
-            try:
-                conn.close()
-            except Exception as e:
-                st.warning(f"Aviso: Erro ao fechar a conexão do banco de dados: {e}")
+# O `ttl` acompanha o intervalo de atualização: os dados são revalidados a cada ciclo (30 segundos por padrão).
+@st.cache(allow_output_mutation=True, suppress_st_warning=True, ttl=INTERVALO_ATUALIZACAO)
+def obter_ordens_servico():
+    """Obtém os dados das ordens de serviço do grupo de trabalho 12 pela fonte de dados configurada."""
+    return fontes_dados.obter_fonte_dados().obter_ordens_servico()
 
 # --- Funções de Processamento de Dados ---
-def processar_dados(df):
-    """Processa e enriquece os dados para análise e visualização."""
+def processar_dados(df, agora=None):
+    """Processa e enriquece os dados para análise e visualização.
+
+    `agora` permite calcular os tempos em aberto num relógio simulado (teste de resistência).
+    """
     if df.empty:
         return df
 
+    agora = agora or datetime.now()
+
     df.columns = [col.lower() for col in df.columns]
 
     colunas_data = ['dt_criacao', 'dt_inicio', 'dt_termino']
     for col in colunas_data:
-        if col in df.columns:
+        # Colunas que já vêm como datetime64 (read_sql, snapshots) não precisam de conversão
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
             df[col] = pd.to_datetime(df[col], errors='coerce')
 
     # Define o status da OS com base nas datas de início e término
@@ -101,10 +60,96 @@ def processar_dados(df):
     mask_em_aberto_ou_iniciando = df['dt_inicio'].isna() & df['dt_criacao'].notna()
     # Calcula a diferença do momento atual para as OS ainda não iniciadas
     df.loc[mask_em_aberto_ou_iniciando, 'tempo_em_aberto_dias'] = \
-        (datetime.now() - df.loc[mask_em_aberto_ou_iniciando, 'dt_criacao']).dt.total_seconds() / (24*60*60)
+        (agora - df.loc[mask_em_aberto_ou_iniciando, 'dt_criacao']).dt.total_seconds() / (24*60*60)
 
     return df
 
+# --- Funções de Agregação do Painel ---
+def filtrar_os_aguardando_inicio(df_processed):
+    """Retorna as OS "Em aberto" (aguardando início), das mais antigas para as mais novas."""
+    # FILTRANDO OS PARA PEGAR APENAS AS "EM ABERTO" (Aguardando Início)
+    os_aguardando_inicio = df_processed[
+        df_processed["status"] == "Em aberto"
+    ].copy()
+
+    return os_aguardando_inicio.sort_values(by="dt_criacao", ascending=True)
+
+def calcular_carga_por_responsavel(df_processed, agora=None):
+    """Conta OS ativas e finalizadas nos últimos 7 dias por responsável e escolhe o melhor desempenho.
+
+    Retorna a tupla (carga_por_responsavel, best_performer_name); o DataFrame vem vazio
+    quando não há OS ativas nem finalizadas recentemente com responsável.
+    """
+    agora = agora or datetime.now()
+    os_em_andamento_ativas = df_processed[
+        (df_processed["status"] == "Em andamento") &
+        (df_processed["nm_responsavel"].notna())
+    ].copy()
+
+    # NOVO CÁLCULO: OS Finalizadas nos Últimos 7 Dias por Responsável
+    data_limite_7_dias = agora - timedelta(days=7)
+    os_finalizadas_ultimos_7_dias = df_processed[
+        (df_processed["status"] == "Concluída") &
+        (df_processed["nm_responsavel"].notna()) &
+        (df_processed["dt_termino"] >= data_limite_7_dias)
+    ].copy()
+
+    # Agrupa e conta as OS finalizadas
+    contagem_finalizadas = os_finalizadas_ultimos_7_dias["nm_responsavel"].value_counts().reset_index()
+    contagem_finalizadas.columns = ["Responsável", "OS Finalizadas (7 dias)"]
+
+    if os_em_andamento_ativas.empty and contagem_finalizadas.empty: # Nada a exibir: nem OS ativas nem finalizadas
+        return pd.DataFrame(columns=["Responsável", "OS Ativas", "OS Finalizadas (7 dias)"]), None
+
+    carga_por_responsavel = os_em_andamento_ativas["nm_responsavel"].value_counts().reset_index()
+    carga_por_responsavel.columns = ["Responsável", "OS Ativas"]
+
+    # MERGE com as OS finalizadas
+    carga_por_responsavel = pd.merge(
+        carga_por_responsavel,
+        contagem_finalizadas,
+        on="Responsável",
+        how="outer" # Usamos 'outer' para incluir responsáveis que só tenham OS ativas OU só tenham finalizadas
+    ).fillna(0) # Preenche NaN com 0 para responsáveis que não tenham a outra categoria
+
+    # Garante que as contagens sejam inteiros
+    carga_por_responsavel["OS Ativas"] = carga_por_responsavel["OS Ativas"].astype(int)
+    carga_por_responsavel["OS Finalizadas (7 dias)"] = carga_por_responsavel["OS Finalizadas (7 dias)"].astype(int)
+
+    # Opcional: Ordenar para uma melhor visualização, talvez por OS Ativas
+    # reset_index: o painel usa o índice como posição da coluna (0 a 8) de cada responsável
+    carga_por_responsavel = carga_por_responsavel.sort_values(by="OS Ativas", ascending=False).reset_index(drop=True)
+
+    # --- Lógica da Coroa para o Melhor Desempenho ---
+    # Encontra o responsável com mais OS finalizadas E menor carga ativa
+    best_performer_name = None
+    if not carga_por_responsavel.empty:
+        # Ordena primeiro por OS Finalizadas (desc) e depois por OS Ativas (asc)
+        # Isso garante que quem fez mais e tem menos carga venha primeiro
+        sorted_for_crown = carga_por_responsavel.sort_values(
+            by=["OS Finalizadas (7 dias)", "OS Ativas"],
+            ascending=[False, True]
+        )
+        best_performer_name = sorted_for_crown.iloc[0]["Responsável"]
+
+    return carga_por_responsavel, best_performer_name
+
+def filtrar_detalhes_responsavel(df_processed, responsavel, agora=None):
+    """Retorna as OS ativas e as concluídas nos últimos 7 dias do responsável selecionado."""
+    agora = agora or datetime.now()
+    selected_resp_df = df_processed[df_processed['nm_responsavel'] == responsavel]
+
+    active_os_details = selected_resp_df[selected_resp_df['status'] == 'Em andamento']
+
+    data_limite_7_dias = agora - timedelta(days=7)
+    completed_os_details = selected_resp_df[
+        (selected_resp_df['status'] == 'Concluída') &
+        (selected_resp_df['dt_termino'].notna()) & # Garante que dt_termino não é NaN
+        (selected_resp_df['dt_termino'] >= data_limite_7_dias)
+    ]
+
+    return active_os_details, completed_os_details
+
 # --- Função para gerar os cards de OS Abertas com HTML customizado ---
 def generate_open_os_cards(df_open_os):
     if df_open_os.empty:
@@ -201,6 +246,64 @@ def generate_os_details_cards(df, card_type):
         """
     return html_cards
 
+# --- Console de Busca de OS (acessado com ?modo=console) ---
+LIMITE_RESULTADOS_CONSOLE = 200 # Máximo de OS exibidas na tabela de resultados
+
+def exibir_console_busca():
+    """Console dos supervisores: busca por palavra-chave e filtros sobre todo o histórico de OS."""
+    st.markdown('<div class="main-panel-title"><h1>Console de Busca de OS</h1></div>', unsafe_allow_html=True)
+
+    df_raw = obter_ordens_servico()
+    if df_raw.empty:
+        st.error("Não foi possível carregar os dados das Ordens de Serviço. Verifique a conexão com o banco de dados e as configurações.")
+        return
+
+    df_processed = processar_dados(df_raw)
+    indice = indice_busca.obter_indice()
+    indice.atualizar(df_processed)
+
+    col_texto, col_solicitante, col_prioridade, col_status, col_responsavel = st.columns([3, 2, 1, 2, 2])
+    with col_texto:
+        texto = st.text_input("Palavras-chave (solicitação ou descrição)", key="console_texto")
+    with col_solicitante:
+        solicitante = st.text_input("Solicitante", key="console_solicitante")
+    with col_prioridade:
+        prioridades = st.multiselect("Prioridade", sorted(df_processed['ie_prioridade'].dropna().unique()), key="console_prioridade")
+    with col_status:
+        status = st.multiselect("Status", ["Em aberto", "Em andamento", "Concluída"],
+                                default=["Em aberto", "Em andamento"], key="console_status")
+    with col_responsavel:
+        responsavel = st.selectbox("Responsável", ["Todos"] + indice.responsaveis(), key="console_responsavel")
+
+    inicio_busca = time.perf_counter()
+    nr_os_encontradas = indice.buscar(
+        texto=texto,
+        solicitante=solicitante,
+        prioridades=prioridades,
+        status=status,
+        responsavel=None if responsavel == "Todos" else responsavel,
+    )
+    duracao_busca_ms = (time.perf_counter() - inicio_busca) * 1000
+
+    if not nr_os_encontradas:
+        st.info(f"Nenhuma Ordem de Serviço encontrada ({duracao_busca_ms:.1f} ms).")
+        return
+
+    st.success(f"**{len(nr_os_encontradas)}** Ordens de Serviço encontradas em {duracao_busca_ms:.1f} ms.")
+    if len(nr_os_encontradas) > LIMITE_RESULTADOS_CONSOLE:
+        st.markdown(f"<p class='last-updated'>Exibindo as {LIMITE_RESULTADOS_CONSOLE} mais recentes. Refine a busca para ver as demais.</p>", unsafe_allow_html=True)
+
+    resultado = df_processed[df_processed['nr_os'].isin(nr_os_encontradas[:LIMITE_RESULTADOS_CONSOLE])]
+    resultado = resultado.sort_values(by="nr_os", ascending=False)[[
+        'nr_os', 'status', 'ie_prioridade', 'ds_solicitacao', 'nm_solicitante',
+        'nm_responsavel', 'dt_criacao', 'dt_inicio', 'dt_termino', 'ds_completa_servico',
+    ]].rename(columns={
+        'nr_os': 'OS', 'status': 'Status', 'ie_prioridade': 'Prioridade', 'ds_solicitacao': 'Solicitação',
+        'nm_solicitante': 'Solicitante', 'nm_responsavel': 'Responsável', 'dt_criacao': 'Criada em',
+        'dt_inicio': 'Iniciada em', 'dt_termino': 'Finalizada em', 'ds_completa_servico': 'Descrição',
+    })
+    st.dataframe(resultado, use_container_width=True)
+
 # --- Função Principal do Aplicativo Streamlit ---
 def main():
     # Injeta CSS personalizado para estilização do painel (Onde a magia acontece)
@@ -520,6 +623,11 @@ def main():
         unsafe_allow_html=True
     )
 
+    # O console de busca é interativo e não participa do loop de atualização das TVs
+    if st.experimental_get_query_params().get("modo", [""])[0] == "console":
+        exibir_console_busca()
+        return
+
     # O loop infinito para auto-atualização do dashboard
     while True:
         placeholder_content = st.empty()
@@ -537,15 +645,17 @@ def main():
             # --- Obtenção e Processamento de Dados ---
             with st.spinner("Carregando e processando dados do banco de dados..."):
                 # Obter dados. O cache já gerencia a invalidação pelo ttl no decorador.
-                df_raw = obter_ordens_servico(USERNAME, PASSWORD, HOST, PORT, SERVICE)
+                df_raw = obter_ordens_servico()
 
             if df_raw.empty:
                 st.error("Não foi possível carregar os dados das Ordens de Serviço. Verifique a conexão com o banco de dados e as configurações.")
-                time.sleep(30)
+                time.sleep(INTERVALO_ATUALIZACAO)
                 st.experimental_rerun() # Força a reinicialização em caso de erro
                 continue
 
             df_processed = processar_dados(df_raw)
+            # Mantém o índice do console de busca em dia (só reindexa as OS que mudaram no snapshot)
+            indice_busca.obter_indice().atualizar(df_processed)
 
             # --- Resumo Geral de Métricas (Cards no topo) ---
             st.markdown("<h2>Resumo Operacional</h2>", unsafe_allow_html=True)
@@ -570,12 +680,7 @@ def main():
             # --- Seção de Ordens de Serviço Abertas e Aguardando Início (Cards) ---
             st.markdown("<h2>Ordens de Serviço Abertas e Aguardando Início</h2>", unsafe_allow_html=True)
 
-            # FILTRANDO OS PARA PEGAR APENAS AS "EM ABERTO" (Aguardando Início)
-            os_aguardando_inicio = df_processed[
-                df_processed["status"] == "Em aberto"
-            ].copy()
-
-            os_aguardando_inicio = os_aguardando_inicio.sort_values(by="dt_criacao", ascending=True)
+            os_aguardando_inicio = filtrar_os_aguardando_inicio(df_processed)
 
             if not os_aguardando_inicio.empty:
                 st.success(f"**{len(os_aguardando_inicio)}** Ordens de Serviço atualmente aguardando início. Atenção às mais antigas!")
@@ -591,54 +696,9 @@ def main():
             # --- Seção de Carga de Trabalho por Responsável ---
             st.markdown("<h2>Carga de Trabalho de Ordens de Serviço Ativas por Responsável</h2>", unsafe_allow_html=True)
 
-            os_em_andamento_ativas = df_processed[
-                (df_processed["status"] == "Em andamento") &
-                (df_processed["nm_responsavel"].notna())
-            ].copy()
-
-            # NOVO CÁLCULO: OS Finalizadas nos Últimos 7 Dias por Responsável
-            data_limite_7_dias = datetime.now() - timedelta(days=7)
-            os_finalizadas_ultimos_7_dias = df_processed[
-                (df_processed["status"] == "Concluída") &
-                (df_processed["nm_responsavel"].notna()) &
-                (df_processed["dt_termino"] >= data_limite_7_dias)
-            ].copy()
-
-            # Agrupa e conta as OS finalizadas
-            contagem_finalizadas = os_finalizadas_ultimos_7_dias["nm_responsavel"].value_counts().reset_index()
-            contagem_finalizadas.columns = ["Responsável", "OS Finalizadas (7 dias)"]
-
-            if not os_em_andamento_ativas.empty or not contagem_finalizadas.empty: # Condição para exibir se há OS ativas OU finalizadas
-                carga_por_responsavel = os_em_andamento_ativas["nm_responsavel"].value_counts().reset_index()
-                carga_por_responsavel.columns = ["Responsável", "OS Ativas"]
-
-                # MERGE com as OS finalizadas
-                carga_por_responsavel = pd.merge(
-                    carga_por_responsavel,
-                    contagem_finalizadas,
-                    on="Responsável",
-                    how="outer" # Usamos 'outer' para incluir responsáveis que só tenham OS ativas OU só tenham finalizadas
-                ).fillna(0) # Preenche NaN com 0 para responsáveis que não tenham a outra categoria
-
-                # Garante que as contagens sejam inteiros
-                carga_por_responsavel["OS Ativas"] = carga_por_responsavel["OS Ativas"].astype(int)
-                carga_por_responsavel["OS Finalizadas (7 dias)"] = carga_por_responsavel["OS Finalizadas (7 dias)"].astype(int)
-
-                # Opcional: Ordenar para uma melhor visualização, talvez por OS Ativas
-                carga_por_responsavel = carga_por_responsavel.sort_values(by="OS Ativas", ascending=False)
-
-                # --- Lógica da Coroa para o Melhor Desempenho ---
-                # Encontra o responsável com mais OS finalizadas E menor carga ativa
-                best_performer_name = None
-                if not carga_por_responsavel.empty:
-                    # Ordena primeiro por OS Finalizadas (desc) e depois por OS Ativas (asc)
-                    # Isso garante que quem fez mais e tem menos carga venha primeiro
-                    sorted_for_crown = carga_por_responsavel.sort_values(
-                        by=["OS Finalizadas (7 dias)", "OS Ativas"],
-                        ascending=[False, True]
-                    )
-                    best_performer_name = sorted_for_crown.iloc[0]["Responsável"]
+            carga_por_responsavel, best_performer_name = calcular_carga_por_responsavel(df_processed)
 
+            if not carga_por_responsavel.empty: # Exibe se há OS ativas OU finalizadas
                 # Inicializa a variável de estado da sessão para armazenar o responsável selecionado
                 if 'selected_responsible' not in st.session_state:
                     st.session_state.selected_responsible = None
@@ -694,10 +754,11 @@ def main():
             if st.session_state.selected_responsible:
                 st.markdown(f"<h2>Detalhes para {st.session_state.selected_responsible}</h2>", unsafe_allow_html=True)
 
-                selected_resp_df = df_processed[df_processed['nm_responsavel'] == st.session_state.selected_responsible]
+                active_os_details, completed_os_details = filtrar_detalhes_responsavel(
+                    df_processed, st.session_state.selected_responsible
+                )
 
                 # Detalhes das OS Ativas para o responsável selecionado
-                active_os_details = selected_resp_df[selected_resp_df['status'] == 'Em andamento']
                 if not active_os_details.empty:
                     st.markdown(f"<h3>OS Ativas de {st.session_state.selected_responsible}: ({len(active_os_details)})</h3>", unsafe_allow_html=True)
                     # Renderiza os cards de OS ativas
@@ -708,12 +769,6 @@ def main():
                 st.markdown("<br>", unsafe_allow_html=True) # Adiciona um espaço para separar
 
                 # Detalhes das OS Concluídas nos últimos 7 dias para o responsável selecionado
-                data_limite_7_dias = datetime.now() - timedelta(days=7)
-                completed_os_details = selected_resp_df[
-                    (selected_resp_df['status'] == 'Concluída') &
-                    (selected_resp_df['dt_termino'].notna()) & # Garante que dt_termino não é NaN
-                    (selected_resp_df['dt_termino'] >= data_limite_7_dias)
-                ]
                 if not completed_os_details.empty:
                     st.markdown(f"<h3>OS Concluídas (Últimos 7 Dias) por {st.session_state.selected_responsible}: ({len(completed_os_details)})</h3>", unsafe_allow_html=True)
                     # Renderiza os cards de OS concluídas
@@ -723,8 +778,13 @@ def main():
             else:
                 st.info("Clique em um responsável acima para ver seus detalhes de carga e OS concluídas no período!")
 
-        # Pausa o script por 30 segundos antes da próxima atualização
-        time.sleep(30)
+        # Amostragem opcional de memória do processo (ativada com PY_MAN_MONITOR_MEMORIA=1)
+        monitor = monitor_memoria.obter_monitor()
+        if monitor is not None:
+            monitor.amostrar()
+
+        # Pausa o script pelo intervalo configurado (30 segundos por padrão) antes da próxima atualização
+        time.sleep(INTERVALO_ATUALIZACAO)
         # Força a reinicialização do script, o que efetivamente "atualiza" a página
         st.experimental_rerun()
 
@@ -0,0 +1,165 @@
+"""Banco de dados simulado que imita a consulta de MAN_ORDEM_SERVICO usada pelo painel.
+
+Permite rodar o painel (e os testes de carga) sem acesso ao Oracle de produção.
+Cada OS nasce com as datas de início e término já sorteadas; a cada consulta só
+aparecem as datas que já "aconteceram", de modo que o painel evolui com o tempo
+como no banco real: chegam OS novas, OS abertas são iniciadas e depois concluídas.
+"""
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# --- Valores usados para compor as OS simuladas ---
+RESPONSAVEIS = [
+    'jsilva', 'msouza', 'aoliveira', 'rpereira', 'clima', 'fcosta',
+    'gferreira', 'lalmeida', 'mrodrigues', 'pgomes', 'tmartins', 'vbarbosa',
+]
+
+SOLICITANTES = [
+    'Ana Paula Ribeiro', 'Carlos Eduardo Santos', 'Fernanda Lopes', 'João Batista Moreira',
+    'Luciana Araújo', 'Marcos Vinícius Teixeira', 'Patrícia Monteiro', 'Ricardo Nogueira',
+    'Sandra Cristina Dias', 'Tatiane Cardoso', 'Vanessa Fonseca', 'Wagner Mendes',
+]
+
+SERVICOS = [
+    'Troca de lâmpada', 'Ar-condicionado não liga', 'Vazamento na pia', 'Porta emperrada',
+    'Tomada sem energia', 'Cadeira de rodas com roda quebrada', 'Conserto de maca',
+    'Instalação de suporte de TV', 'Reparo no chuveiro elétrico', 'Infiltração no teto',
+    'Cama hospitalar com defeito no controle', 'Manutenção preventiva da autoclave',
+    'Troca de fechadura', 'Descarga do vaso sanitário quebrada', 'Pintura de parede',
+]
+
+LOCAIS = [
+    'UTI Adulto', 'Pronto Socorro', 'Centro Cirúrgico', 'Enfermaria 2º andar', 'Recepção',
+    'Farmácia', 'Laboratório', 'Maternidade', 'Pediatria', 'Almoxarifado',
+]
+
+# Prioridades do Tasy (Baixa, Média, Alta, Urgente) e seus pesos no sorteio
+PRIORIDADES = ['B', 'M', 'A', 'U']
+PESOS_PRIORIDADES = [0.35, 0.40, 0.20, 0.05]
+
+
+class BancoSimulado:
+    """Mantém o histórico de OS simuladas e responde à consulta do painel."""
+
+    def __init__(self, dias_historico=365, os_por_dia=25, latencia=0.0, semente=42, agora=None):
+        self.os_por_dia = os_por_dia
+        self.latencia = latencia # Tempo (s) gasto em cada consulta, imitando o Oracle
+        self._rng = random.Random(semente)
+        self._lock = threading.Lock() # Várias sessões do Streamlit consultam ao mesmo tempo
+        self._proximo_nr_os = 100000
+        self._historico = None # DataFrame com as OS já convertidas
+        # OS sorteadas desde a última consulta, ainda não convertidas para o DataFrame
+        self._colunas = {nome: [] for nome in (
+            'NR_OS', 'DS_SOLICITACAO', 'NM_SOLICITANTE', 'IE_PRIORIDADE', 'DT_CRIACAO',
+            'DT_INICIO', 'DT_TERMINO', 'NM_RESPONSAVEL', 'DS_COMPLETA_SERVICO',
+        )}
+
+        agora = agora or datetime.now()
+        self._proxima_chegada = agora - timedelta(days=dias_historico)
+        self._sortear_proxima_chegada()
+        self._gerar_chegadas(agora)
+
+    def _nova_os(self, dt_criacao):
+        """Sorteia uma OS criada em `dt_criacao`, já com início e término previstos."""
+        rng = self._rng
+        servico = rng.choice(SERVICOS)
+        local = rng.choice(LOCAIS)
+        prioridade = rng.choices(PRIORIDADES, PESOS_PRIORIDADES)[0]
+
+        # Tempo até o início: em média 1 dia, com uma cauda longa que gera cards de alerta
+        horas_ate_inicio = rng.expovariate(1 / 24) * (0.5 if prioridade in ('A', 'U') else 1)
+        horas_execucao = rng.expovariate(1 / 30)
+        # O responsável só aparece na consulta depois que a OS é iniciada
+        responsavel = rng.choice(RESPONSAVEIS)
+
+        dt_inicio = dt_criacao + timedelta(hours=horas_ate_inicio)
+        dt_termino = dt_inicio + timedelta(hours=horas_execucao)
+
+        self._colunas['NR_OS'].append(self._proximo_nr_os)
+        self._colunas['DS_SOLICITACAO'].append(f"{servico} - {local}")
+        self._colunas['NM_SOLICITANTE'].append(rng.choice(SOLICITANTES))
+        self._colunas['IE_PRIORIDADE'].append(prioridade)
+        self._colunas['DT_CRIACAO'].append(dt_criacao)
+        self._colunas['DT_INICIO'].append(dt_inicio)
+        self._colunas['DT_TERMINO'].append(dt_termino)
+        self._colunas['NM_RESPONSAVEL'].append(responsavel)
+        self._colunas['DS_COMPLETA_SERVICO'].append(
+            f"{servico} no setor {local}. Solicitado com prioridade {prioridade}. "
+            f"Favor verificar com a equipe do setor antes de iniciar o serviço."
+        )
+        self._proximo_nr_os += 1
+
+    def _sortear_proxima_chegada(self):
+        intervalo_medio_horas = 24 / self.os_por_dia
+        self._proxima_chegada += timedelta(hours=self._rng.expovariate(1 / intervalo_medio_horas))
+
+    def _gerar_chegadas(self, agora):
+        """Cria as OS que chegaram entre a última consulta e `agora` (processo de Poisson).
+
+        A chegada sorteada depois de `agora` fica guardada para a próxima consulta; sorteá-la
+        de novo a cada consulta faria consultas repetidas no mesmo instante criarem OS.
+        """
+        while self._proxima_chegada <= agora:
+            self._nova_os(self._proxima_chegada)
+            self._sortear_proxima_chegada()
+
+    def _atualizar_historico(self):
+        """Acrescenta ao DataFrame do histórico só as OS sorteadas desde a última consulta.
+
+        Converter o histórico inteiro a cada consulta dominava o tempo do teste de resistência.
+        """
+        if self._historico is None or self._colunas['NR_OS']:
+            novas = pd.DataFrame(self._colunas)
+            if self._historico is None or self._historico.empty:
+                self._historico = novas
+            else:
+                self._historico = pd.concat([self._historico, novas], ignore_index=True)
+            for valores in self._colunas.values():
+                valores.clear()
+        return self._historico
+
+    def consultar(self, agora=None):
+        """Retorna o DataFrame no mesmo formato da consulta Oracle, visto no instante `agora`."""
+        agora = agora or datetime.now()
+        with self._lock:
+            self._gerar_chegadas(agora)
+            df = self._atualizar_historico().copy()
+
+        # Datas futuras ainda não aconteceram: no banco real elas estariam nulas
+        limite = np.datetime64(agora)
+        df.loc[df['DT_INICIO'] > limite, ['DT_INICIO', 'NM_RESPONSAVEL']] = None
+        df.loc[df['DT_TERMINO'] > limite, 'DT_TERMINO'] = None
+
+        if self.latencia:
+            time.sleep(self.latencia)
+        return df
+
+
+# Instância única compartilhada por todas as sessões do servidor Streamlit
+_banco = None
+_banco_lock = threading.Lock()
+
+
+def obter_banco():
+    """Retorna o banco simulado do processo, criando-o a partir das variáveis de ambiente."""
+    global _banco
+    with _banco_lock:
+        if _banco is None:
+            _banco = BancoSimulado(
+                dias_historico=int(os.environ.get('PY_MAN_SIMULADA_DIAS_HISTORICO', '365')),
+                os_por_dia=float(os.environ.get('PY_MAN_SIMULADA_OS_POR_DIA', '25')),
+                latencia=float(os.environ.get('PY_MAN_SIMULADA_LATENCIA', '0')),
+                semente=int(os.environ.get('PY_MAN_SIMULADA_SEMENTE', '42')),
+            )
+        return _banco
+
+
+def obter_ordens_servico_simuladas():
+    """Equivalente simulado de `obter_ordens_servico` do app."""
+    return obter_banco().consultar()
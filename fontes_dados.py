@@ -0,0 +1,305 @@
+"""Fontes de dados do painel: Oracle, banco simulado, gravação e reprodução.
+
+O app pede os dados a uma `FonteDados` escolhida por variáveis de ambiente, o que
+permite reproduzir fora da produção uma atualização lenta: `FonteGravacao` salva
+cada resultado da consulta como snapshot comprimido e `FonteReproducao` devolve
+esses snapshots na ordem em que foram gravados, sem banco de dados.
+
+Variáveis de ambiente:
+    PY_MAN_FONTE_DADOS             "oracle" (padrão), "simulada" ou "reproducao"
+    PY_MAN_ORACLE_USUARIO/SENHA/HOST/PORTA/SERVICO   conexão com o Oracle
+    PY_MAN_GRAVAR_EM               diretório onde gravar os snapshots da fonte escolhida
+    PY_MAN_REPRODUCAO_DIR          diretório gravado a ser reproduzido
+    PY_MAN_REPRODUCAO_VELOCIDADE   0 = um snapshot por consulta; N = tempo gravado N vezes mais rápido
+    PY_MAN_REPRODUCAO_LATENCIA     1 = cada consulta demora o mesmo que a consulta gravada
+
+Gravação avulsa, sem o Streamlit (um dia, consultando a cada 30s):
+    python fontes_dados.py gravacoes/dia1 --intervalo 30 --duracao 86400
+"""
+import argparse
+import bisect
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+import dados_simulados
+
+logger = logging.getLogger(__name__)
+
+# --- Configuração do Banco de Dados Oracle ---
+# Os padrões são os que ficavam fixos no app.py e só podem sair quando todos os servidores
+# definirem as variáveis de ambiente; não os repita em outros arquivos.
+ORACLE_USUARIO = os.environ.get('PY_MAN_ORACLE_USUARIO', 'TASY')
+ORACLE_SENHA = os.environ.get('PY_MAN_ORACLE_SENHA', 'aloisk')
+ORACLE_HOST = os.environ.get('PY_MAN_ORACLE_HOST', '10.250.250.190')
+ORACLE_PORTA = int(os.environ.get('PY_MAN_ORACLE_PORTA', '1521'))
+ORACLE_SERVICO = os.environ.get('PY_MAN_ORACLE_SERVICO', 'dbprod.santacasapc')
+
+QUERY_ORDENS_SERVICO = """
+select  nr_sequencia as nr_os,
+        ds_dano_breve as ds_solicitacao,
+        obter_nome_pf(cd_pessoa_solicitante) as nm_solicitante,
+        ie_prioridade,
+        dt_ordem_servico as dt_criacao,
+        dt_inicio_real as dt_inicio,
+        dt_fim_real as dt_termino,
+        nm_usuario as nm_responsavel,
+        ds_dano as ds_completa_servico
+from    MAN_ORDEM_SERVICO
+where   NR_GRUPO_TRABALHO = 12
+"""
+
+ARQUIVO_MANIFESTO = 'manifesto.jsonl'
+
+
+class FonteDados:
+    """Interface comum: `obter_ordens_servico()` devolve o DataFrame cru da consulta."""
+
+    def obter_ordens_servico(self):
+        raise NotImplementedError
+
+
+class FonteOracle(FonteDados):
+    """Consulta de produção no Oracle (Tasy), abrindo uma conexão por consulta."""
+
+    def __init__(self, username=ORACLE_USUARIO, password=ORACLE_SENHA, host=ORACLE_HOST,
+                 port=ORACLE_PORTA, service=ORACLE_SERVICO):
+        import oracledb # Só é necessário com esta fonte; a reprodução roda sem o driver
+
+        self._oracledb = oracledb
+        self.username = username
+        self.password = password
+        self.dsn = f"{host}:{port}/{service}"
+
+        # Inicializa o cliente Oracle Instant Client
+        try:
+            oracledb.init_oracle_client()
+        except Exception as e:
+            # Fora de uma sessão do Streamlit (ex.: gravador avulso) o st.error não aparece: vai também para o log
+            logger.error("Erro na inicialização do Oracle Instant Client: %s", e)
+            # Em um painel de TV, erros na sidebar não são ideais. Exibimos na tela principal.
+            st.error(f"Erro na inicialização do Oracle Instant Client: {e}. Verifique a configuração e as variáveis de ambiente.")
+
+    def criar_conexao(self):
+        """Cria e retorna uma nova conexão com o banco de dados Oracle."""
+        try:
+            return self._oracledb.connect(user=self.username, password=self.password, dsn=self.dsn)
+        except Exception as e:
+            logger.error("Erro ao tentar conectar ao banco de dados %s: %s", self.dsn, e)
+            # Erro de conexão exibido na tela principal do painel
+            st.error(f"Erro ao tentar conectar ao banco de dados: {e}. Verifique as credenciais e a conexão com o servidor.")
+            return None
+
+    def obter_ordens_servico(self):
+        """Obtém os dados das ordens de serviço do grupo de trabalho 12, criando uma nova conexão."""
+        conn = None
+        try:
+            conn = self.criar_conexao()
+            if conn is None:
+                return pd.DataFrame() # Retorna DataFrame vazio se a conexão falhar
+            return pd.read_sql(QUERY_ORDENS_SERVICO, conn)
+        except Exception as e:
+            logger.exception("Erro ao executar consulta SQL")
+            st.error(f"Erro ao executar consulta SQL: {e}. Verifique a query ou o acesso ao banco de dados.")
+            return pd.DataFrame()
+        finally:
+            if conn: # Garante que a conexão seja fechada se foi aberta
+                try:
+                    conn.close()
+                except Exception as e:
+                    logger.warning("Erro ao fechar a conexão do banco de dados: %s", e)
+                    st.warning(f"Aviso: Erro ao fechar a conexão do banco de dados: {e}")
+
+
+class FonteSimulada(FonteDados):
+    """Banco falso de `dados_simulados`, usado nos testes de carga."""
+
+    def obter_ordens_servico(self):
+        return dados_simulados.obter_ordens_servico_simuladas()
+
+
+class FonteGravacao(FonteDados):
+    """Repassa as consultas de outra fonte, gravando cada resultado num diretório.
+
+    Cada consulta vira uma linha em `manifesto.jsonl` (instante, arquivo, duração da
+    consulta); o DataFrame só é gravado (pickle com gzip) quando difere do anterior,
+    já que em boa parte do dia a consulta devolve exatamente o mesmo resultado.
+    """
+
+    def __init__(self, fonte, diretorio):
+        self.fonte = fonte
+        self.diretorio = diretorio
+        os.makedirs(diretorio, exist_ok=True)
+        self._lock = threading.Lock()
+        self._numero = len(glob.glob(os.path.join(diretorio, 'snapshot_*.pkl.gz')))
+        self._ultimo_hash = None
+        self._ultimo_arquivo = None
+
+    def obter_ordens_servico(self):
+        inicio = time.perf_counter()
+        df = self.fonte.obter_ordens_servico()
+        duracao = time.perf_counter() - inicio
+        if not df.empty:
+            try:
+                self._gravar(df, duracao)
+            except Exception:
+                # Falha na gravação não pode derrubar o painel
+                logger.exception("Falha ao gravar snapshot em %s", self.diretorio)
+        return df
+
+    def _gravar(self, df, duracao):
+        hash_df = hashlib.sha1(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+        hash_df.update(','.join(map(str, df.columns)).encode())
+        hash_df = hash_df.hexdigest()
+
+        with self._lock:
+            if hash_df != self._ultimo_hash:
+                self._numero += 1
+                arquivo = f"snapshot_{self._numero:06d}.pkl.gz"
+                df.to_pickle(os.path.join(self.diretorio, arquivo), compression='gzip')
+                self._ultimo_hash, self._ultimo_arquivo = hash_df, arquivo
+
+            registro = {
+                'instante': datetime.now().isoformat(),
+                'arquivo': self._ultimo_arquivo,
+                'linhas': len(df),
+                'duracao_s': round(duracao, 4),
+            }
+            with open(os.path.join(self.diretorio, ARQUIVO_MANIFESTO), 'a', encoding='utf-8') as manifesto:
+                manifesto.write(json.dumps(registro) + '\n')
+
+
+class FonteReproducao(FonteDados):
+    """Devolve os snapshots de uma gravação na ordem em que foram capturados.
+
+    Com `velocidade=0` cada consulta avança um registro do manifesto, o que torna as
+    execuções determinísticas. Com `velocidade>0` o registro é escolhido pelo tempo
+    decorrido desde a primeira consulta, multiplicado pela velocidade. Ao fim da
+    gravação a fonte recomeça (`repetir=True`) ou continua no último registro.
+    `simular_latencia=True` espera o tempo que a consulta original levou.
+    """
+
+    def __init__(self, diretorio, velocidade=0.0, repetir=False, simular_latencia=False):
+        self.diretorio = diretorio
+        self.velocidade = velocidade
+        self.repetir = repetir
+        self.simular_latencia = simular_latencia
+
+        with open(os.path.join(diretorio, ARQUIVO_MANIFESTO), encoding='utf-8') as manifesto:
+            self.registros = [json.loads(linha) for linha in manifesto if linha.strip()]
+        if not self.registros:
+            raise ValueError(f"Gravação vazia em {diretorio}")
+        for registro in self.registros:
+            registro['instante'] = datetime.fromisoformat(registro['instante'])
+        primeiro = self.registros[0]['instante']
+        # Segundos de cada registro desde o início da gravação, para a reprodução por tempo
+        self._deslocamentos = [(r['instante'] - primeiro).total_seconds() for r in self.registros]
+
+        self._lock = threading.Lock()
+        self._posicao = -1
+        self._inicio_real = None
+        self._arquivo_carregado = None
+        self._df_carregado = None
+
+    def __len__(self):
+        return len(self.registros)
+
+    @property
+    def instante_atual(self):
+        """Instante em que o snapshot devolvido por último foi gravado (use como `agora`)."""
+        return self.registros[max(self._posicao, 0)]['instante']
+
+    def _proxima_posicao(self):
+        if self.velocidade > 0:
+            if self._inicio_real is None:
+                self._inicio_real = time.monotonic()
+            decorrido = (time.monotonic() - self._inicio_real) * self.velocidade
+            total = self._deslocamentos[-1]
+            if self.repetir and total > 0:
+                decorrido %= total
+            return bisect.bisect_right(self._deslocamentos, decorrido) - 1
+        posicao = self._posicao + 1
+        if posicao >= len(self.registros):
+            posicao = 0 if self.repetir else len(self.registros) - 1
+        return posicao
+
+    def obter_ordens_servico(self):
+        with self._lock:
+            self._posicao = self._proxima_posicao()
+            registro = self.registros[self._posicao]
+            if registro['arquivo'] != self._arquivo_carregado:
+                self._df_carregado = pd.read_pickle(os.path.join(self.diretorio, registro['arquivo']), compression='gzip')
+                self._arquivo_carregado = registro['arquivo']
+            df = self._df_carregado.copy() # O app altera o DataFrame recebido (processar_dados)
+
+        if self.simular_latencia:
+            time.sleep(registro['duracao_s'])
+        return df
+
+
+def criar_fonte_dados():
+    """Monta a fonte de dados descrita pelas variáveis de ambiente."""
+    tipo = os.environ.get('PY_MAN_FONTE_DADOS', 'oracle')
+    if tipo == 'oracle':
+        fonte = FonteOracle()
+    elif tipo == 'simulada':
+        fonte = FonteSimulada()
+    elif tipo == 'reproducao':
+        fonte = FonteReproducao(
+            os.environ['PY_MAN_REPRODUCAO_DIR'],
+            velocidade=float(os.environ.get('PY_MAN_REPRODUCAO_VELOCIDADE', '0')),
+            repetir=True, # O painel nunca para de consultar
+            simular_latencia=os.environ.get('PY_MAN_REPRODUCAO_LATENCIA') == '1',
+        )
+    else:
+        raise ValueError(f"PY_MAN_FONTE_DADOS inválida: {tipo!r} (use oracle, simulada ou reproducao)")
+
+    diretorio_gravacao = os.environ.get('PY_MAN_GRAVAR_EM')
+    if diretorio_gravacao:
+        fonte = FonteGravacao(fonte, diretorio_gravacao)
+    return fonte
+
+
+# Instância única do processo, preservada entre as reexecuções do script pelo Streamlit
+_fonte = None
+_fonte_lock = threading.Lock()
+
+
+def obter_fonte_dados():
+    """Retorna a fonte de dados do processo, criando-a na primeira chamada."""
+    global _fonte
+    with _fonte_lock:
+        if _fonte is None:
+            _fonte = criar_fonte_dados()
+        return _fonte
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grava os resultados da consulta de OS para reprodução posterior.")
+    parser.add_argument('diretorio', help="Diretório da gravação (criado se não existir)")
+    parser.add_argument('--intervalo', type=float, default=30, help="Segundos entre consultas")
+    parser.add_argument('--duracao', type=float, default=24 * 60 * 60, help="Duração total da gravação em segundos")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    os.environ.pop('PY_MAN_GRAVAR_EM', None) # A gravação aqui é explícita
+    gravador = FonteGravacao(criar_fonte_dados(), args.diretorio)
+
+    fim = time.monotonic() + args.duracao
+    while time.monotonic() < fim:
+        inicio = time.monotonic()
+        df = gravador.obter_ordens_servico()
+        logger.info("%d linhas consultadas em %.2fs", len(df), time.monotonic() - inicio)
+        time.sleep(max(0.0, args.intervalo - (time.monotonic() - inicio)))
+
+
+if __name__ == "__main__":
+    main()
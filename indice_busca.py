@@ -0,0 +1,218 @@
+"""Índice invertido para busca e filtro de OS no console de operações.
+
+Percorrer o histórico inteiro de MAN_ORDEM_SERVICO com `str.contains` a cada tecla
+é lento demais. Este índice guarda, para cada termo normalizado (minúsculo e sem
+acentos), o conjunto de `nr_os` que o contém, além de facetas para prioridade,
+status e responsável. A cada novo snapshot só as OS novas, alteradas ou removidas
+são reindexadas: a comparação é feita por hash vetorizado das colunas indexadas.
+"""
+import bisect
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+import pandas as pd
+
+# Colunas cujo conteúdo, se alterado, exige reindexar a OS
+COLUNAS_INDEXADAS = ['ds_solicitacao', 'ds_completa_servico', 'nm_solicitante',
+                     'ie_prioridade', 'status', 'nm_responsavel']
+
+# Palavras muito comuns em português que não ajudam a filtrar
+STOPWORDS = {
+    'a', 'o', 'e', 'as', 'os', 'ao', 'aos', 'de', 'da', 'do', 'das', 'dos', 'em', 'no', 'na',
+    'nos', 'nas', 'um', 'uma', 'para', 'pra', 'por', 'com', 'sem', 'que', 'se', 'ou',
+}
+
+_PADRAO_TERMO = re.compile(r'[a-z0-9]+')
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos: "Manutenção" -> "manutencao"."""
+    if texto is None or (isinstance(texto, float) and pd.isna(texto)):
+        return ''
+    decomposto = unicodedata.normalize('NFKD', str(texto))
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def tokenizar(texto):
+    """Lista de termos normalizados do texto, sem stopwords."""
+    return [t for t in _PADRAO_TERMO.findall(normalizar(texto)) if t not in STOPWORDS]
+
+
+def termos_consulta(texto):
+    """Termos de uma busca: os mesmos de `tokenizar`.
+
+    Uma busca feita só de stopwords ("de") mantém o último termo, que casa por prefixo,
+    em vez de ficar sem filtro e devolver o histórico inteiro.
+    """
+    termos = _PADRAO_TERMO.findall(normalizar(texto))
+    return tokenizar(texto) or termos[-1:]
+
+
+class _CampoTexto:
+    """Lista invertida de um campo de texto com busca por prefixo."""
+
+    def __init__(self):
+        self.termos = defaultdict(set)
+        self._vocabulario = None # Lista ordenada dos termos, refeita só quando o vocabulário muda
+
+    def adicionar(self, nr_os, termos):
+        for termo in termos:
+            if termo not in self.termos:
+                self._vocabulario = None
+            self.termos[termo].add(nr_os)
+
+    def remover(self, nr_os, termos):
+        for termo in termos:
+            conjunto = self.termos.get(termo)
+            if conjunto is None:
+                continue
+            conjunto.discard(nr_os)
+            if not conjunto:
+                del self.termos[termo]
+                self._vocabulario = None
+
+    def buscar_prefixo(self, prefixo):
+        """União das OS de todos os termos que começam com `prefixo`."""
+        if self._vocabulario is None:
+            self._vocabulario = sorted(self.termos)
+        inicio = bisect.bisect_left(self._vocabulario, prefixo)
+        resultado = set()
+        for termo in self._vocabulario[inicio:]:
+            if not termo.startswith(prefixo):
+                break
+            resultado |= self.termos[termo]
+        return resultado
+
+
+class IndiceOrdensServico:
+    """Índice das OS atualizado incrementalmente a cada snapshot processado."""
+
+    def __init__(self):
+        self._lock = threading.Lock() # Sessões do Streamlit atualizam e consultam em paralelo
+        self._texto = _CampoTexto() # ds_solicitacao + ds_completa_servico
+        self._solicitante = _CampoTexto()
+        self._prioridade = defaultdict(set)
+        self._status = defaultdict(set)
+        self._responsavel = defaultdict(set)
+        self._nomes_responsaveis = {} # Nome normalizado -> nome como veio do banco
+        self._entradas = {} # nr_os -> o que foi indexado, para poder remover depois
+        self._hashes = pd.Series(dtype='uint64')
+        self._ultimo_snapshot = None
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def atualizar(self, df_processed):
+        """Sincroniza o índice com o snapshot; retorna quantas OS foram (re)indexadas ou removidas."""
+        with self._lock:
+            # O cache do app devolve o mesmo DataFrame até o ttl vencer: nada a fazer
+            if df_processed is self._ultimo_snapshot or df_processed.empty:
+                return 0
+
+            dados = df_processed.set_index('nr_os')[[c for c in COLUNAS_INDEXADAS if c in df_processed.columns]]
+            dados = dados[~dados.index.duplicated(keep='last')]
+            hashes = pd.util.hash_pandas_object(dados, index=False)
+
+            existentes = hashes.index.isin(self._hashes.index)
+            alterados = hashes.index[~existentes].tolist()
+            comuns = hashes[existentes]
+            alterados += comuns.index[comuns.values != self._hashes.loc[comuns.index].values].tolist()
+            removidos = self._hashes.index.difference(hashes.index).tolist()
+
+            for nr_os in removidos:
+                self._remover(nr_os)
+            for registro in dados.loc[alterados].itertuples():
+                self._remover(registro.Index)
+                self._indexar(registro)
+
+            self._hashes = hashes
+            self._ultimo_snapshot = df_processed
+            return len(alterados) + len(removidos)
+
+    def _indexar(self, registro):
+        nr_os = registro.Index
+        termos_texto = set(tokenizar(getattr(registro, 'ds_solicitacao', None))) | \
+            set(tokenizar(getattr(registro, 'ds_completa_servico', None)))
+        termos_solicitante = set(tokenizar(getattr(registro, 'nm_solicitante', None)))
+        prioridade = normalizar(getattr(registro, 'ie_prioridade', None))
+        status = getattr(registro, 'status', None)
+        nome_responsavel = getattr(registro, 'nm_responsavel', None)
+        responsavel = normalizar(nome_responsavel)
+        if responsavel:
+            self._nomes_responsaveis[responsavel] = nome_responsavel
+
+        self._texto.adicionar(nr_os, termos_texto)
+        self._solicitante.adicionar(nr_os, termos_solicitante)
+        self._prioridade[prioridade].add(nr_os)
+        self._status[status].add(nr_os)
+        self._responsavel[responsavel].add(nr_os)
+        self._entradas[nr_os] = (termos_texto, termos_solicitante, prioridade, status, responsavel)
+
+    def _remover(self, nr_os):
+        entrada = self._entradas.pop(nr_os, None)
+        if entrada is None:
+            return
+        termos_texto, termos_solicitante, prioridade, status, responsavel = entrada
+        self._texto.remover(nr_os, termos_texto)
+        self._solicitante.remover(nr_os, termos_solicitante)
+        for faceta, valor in ((self._prioridade, prioridade), (self._status, status),
+                              (self._responsavel, responsavel)):
+            faceta[valor].discard(nr_os)
+            if not faceta[valor]:
+                del faceta[valor]
+
+    def buscar(self, texto='', solicitante='', prioridades=None, status=None, responsavel=None):
+        """Retorna os `nr_os` que atendem a todos os filtros, dos mais recentes para os mais antigos.
+
+        Cada termo de `texto` e `solicitante` casa por prefixo (útil enquanto se digita) e
+        todos precisam estar presentes; stopwords são ignoradas, exceto quando são o único
+        termo. `prioridades` e `status` aceitam listas de valores alternativos; `responsavel`
+        é comparado sem acentos e sem diferenciar maiúsculas.
+        """
+        with self._lock:
+            candidatos = []
+            for campo, consulta in ((self._texto, texto), (self._solicitante, solicitante)):
+                termos = termos_consulta(consulta)
+                if consulta and consulta.strip() and not termos:
+                    return [] # Texto informado sem nenhum termo pesquisável (ex.: só pontuação)
+                for termo in termos:
+                    candidatos.append(campo.buscar_prefixo(termo))
+            if prioridades:
+                candidatos.append(set().union(*(self._prioridade.get(normalizar(p), ()) for p in prioridades)))
+            if status:
+                candidatos.append(set().union(*(self._status.get(s, ()) for s in status)))
+            if responsavel:
+                candidatos.append(set(self._responsavel.get(normalizar(responsavel), ())))
+
+            if not candidatos:
+                resultado = set(self._entradas)
+            else:
+                # Intersecta a partir do menor conjunto para reduzir o trabalho
+                candidatos.sort(key=len)
+                resultado = set(candidatos[0])
+                for conjunto in candidatos[1:]:
+                    if not resultado:
+                        break
+                    resultado &= conjunto
+            return sorted(resultado, reverse=True)
+
+    def responsaveis(self):
+        """Nomes dos responsáveis presentes no índice, para montar filtros."""
+        with self._lock:
+            return sorted(self._nomes_responsaveis[r] for r in self._responsavel if r)
+
+
+# Instância única do processo, compartilhada entre sessões e preservada entre reexecuções do script
+_indice = None
+_indice_lock = threading.Lock()
+
+
+def obter_indice():
+    """Retorna o índice de OS do processo, criando-o na primeira chamada."""
+    global _indice
+    with _indice_lock:
+        if _indice is None:
+            _indice = IndiceOrdensServico()
+        return _indice
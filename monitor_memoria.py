@@ -0,0 +1,162 @@
+"""Monitoramento opcional de memória do painel (tracemalloc + RSS do processo).
+
+O loop de atualização do painel nunca termina e as TVs ficam ligadas por semanas,
+então crescimentos pequenos por ciclo viram centenas de MB. Com
+PY_MAN_MONITOR_MEMORIA=1 o app amostra a memória a cada ciclo e, quando o RSS
+passa do orçamento (PY_MAN_ORCAMENTO_MEMORIA_MB), registra no log os pontos do
+código cuja alocação mais cresceu desde a linha de base.
+
+Variáveis de ambiente:
+    PY_MAN_MONITOR_MEMORIA       "1" ativa o monitor (desativado por padrão)
+    PY_MAN_ORCAMENTO_MEMORIA_MB  orçamento de RSS em MB para o alerta
+    PY_MAN_MONITOR_INTERVALO     segundos mínimos entre amostras (padrão 30)
+    PY_MAN_MONITOR_CSV           arquivo onde cada amostra é acrescentada em CSV
+    PY_MAN_MONITOR_QUADROS       profundidade de pilha do tracemalloc (padrão 1; cada
+                                 quadro a mais deixa o servidor inteiro mais lento)
+"""
+import collections
+import logging
+import os
+import threading
+import time
+import tracemalloc
+
+try:
+    import psutil
+except ImportError:  # Opcional: sem psutil o RSS é lido de /proc (Linux)
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# Alocações do próprio tracemalloc e do import system não interessam no relatório
+FILTROS_SNAPSHOT = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def rss_atual_mb():
+    """RSS atual do processo em MB, ou None se não for possível medir."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open('/proc/self/statm') as arquivo:
+            paginas_residentes = int(arquivo.read().split()[1])
+        return paginas_residentes * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MonitorMemoria:
+    """Amostra RSS e memória rastreada pelo tracemalloc e alerta quando o orçamento é excedido."""
+
+    def __init__(self, orcamento_mb=None, intervalo_minimo=0.0, quadros=1, top=10,
+                 arquivo_csv=None, max_amostras=10000):
+        self.orcamento_mb = orcamento_mb
+        self.intervalo_minimo = intervalo_minimo
+        self.quadros = quadros # Profundidade da pilha por alocação; o relatório por 'lineno' só usa o topo
+        self.top = top
+        self.arquivo_csv = arquivo_csv
+        # Histórico limitado para que o próprio monitor não vire um vazamento
+        self.amostras = collections.deque(maxlen=max_amostras)
+
+        self._lock = threading.Lock() # Todas as sessões do Streamlit compartilham o monitor
+        self._base = None
+        self._ultima_amostra = None
+        self._rss_ultimo_alerta = None
+
+    def iniciar(self):
+        """Liga o tracemalloc (se preciso) e tira a foto de referência."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.quadros)
+        self.redefinir_base()
+        return self
+
+    def redefinir_base(self):
+        """Usa o estado atual como linha de base (ex.: depois do aquecimento)."""
+        self._base = tracemalloc.take_snapshot().filter_traces(FILTROS_SNAPSHOT)
+        self._rss_ultimo_alerta = None
+
+    def amostrar(self, instante=None):
+        """Registra uma amostra; retorna o dicionário da amostra ou None se ainda não deu o intervalo."""
+        agora = time.monotonic()
+        with self._lock:
+            if self._ultima_amostra is not None and agora - self._ultima_amostra < self.intervalo_minimo:
+                return None
+            self._ultima_amostra = agora
+
+            atual, pico = tracemalloc.get_traced_memory()
+            amostra = {
+                'instante': instante if instante is not None else time.time(),
+                'rss_mb': rss_atual_mb(),
+                'rastreada_mb': atual / (1024 * 1024),
+                'pico_mb': pico / (1024 * 1024),
+            }
+            self.amostras.append(amostra)
+            if self.arquivo_csv:
+                self._gravar_csv(amostra)
+            self._verificar_orcamento(amostra)
+            return amostra
+
+    def _gravar_csv(self, amostra):
+        novo = not os.path.exists(self.arquivo_csv)
+        with open(self.arquivo_csv, 'a', encoding='utf-8') as arquivo:
+            if novo:
+                arquivo.write(','.join(amostra) + '\n')
+            arquivo.write(','.join('' if v is None else f"{v:.3f}" for v in amostra.values()) + '\n')
+
+    def _verificar_orcamento(self, amostra):
+        rss = amostra['rss_mb']
+        if self.orcamento_mb is None or rss is None or rss <= self.orcamento_mb:
+            return
+        # Alerta ao cruzar o orçamento e de novo a cada 10% de crescimento, para não inundar o log
+        if self._rss_ultimo_alerta is not None and rss < self._rss_ultimo_alerta * 1.1:
+            return
+        self._rss_ultimo_alerta = rss
+        logger.warning(
+            "Memória acima do orçamento: RSS %.1f MB > %.1f MB (rastreada %.1f MB). "
+            "Maiores crescimentos desde a linha de base:\n%s",
+            rss, self.orcamento_mb, amostra['rastreada_mb'], self.formatar_crescimentos(),
+        )
+
+    def principais_crescimentos(self, agrupar_por='lineno'):
+        """Lista de `tracemalloc.StatisticDiff` com os maiores crescimentos desde a linha de base."""
+        if self._base is None:
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces(FILTROS_SNAPSHOT)
+        diferencas = snapshot.compare_to(self._base, agrupar_por)
+        return [d for d in diferencas if d.size_diff > 0][:self.top]
+
+    def formatar_crescimentos(self):
+        linhas = []
+        for diferenca in self.principais_crescimentos():
+            quadro = diferenca.traceback[0]
+            linhas.append(
+                f"  {quadro.filename}:{quadro.lineno}: +{diferenca.size_diff / 1024:.1f} KB "
+                f"(total {diferenca.size / 1024:.1f} KB, +{diferenca.count_diff} blocos)"
+            )
+        return '\n'.join(linhas) or "  (nenhum crescimento rastreado)"
+
+
+# Instância única do processo, preservada entre as reexecuções do script pelo Streamlit
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def obter_monitor():
+    """Retorna o monitor do processo se PY_MAN_MONITOR_MEMORIA estiver ativo, senão None."""
+    global _monitor
+    if os.environ.get('PY_MAN_MONITOR_MEMORIA', '').lower() not in ('1', 'true', 'sim'):
+        return None
+    with _monitor_lock:
+        if _monitor is None:
+            orcamento = os.environ.get('PY_MAN_ORCAMENTO_MEMORIA_MB')
+            _monitor = MonitorMemoria(
+                orcamento_mb=float(orcamento) if orcamento else None,
+                intervalo_minimo=float(os.environ.get('PY_MAN_MONITOR_INTERVALO', '30')),
+                quadros=int(os.environ.get('PY_MAN_MONITOR_QUADROS', '1')),
+                arquivo_csv=os.environ.get('PY_MAN_MONITOR_CSV'),
+            ).iniciar()
+        return _monitor
@@ -0,0 +1,118 @@
+"""Perfil de desempenho do ciclo do painel sobre uma gravação real, sem banco de dados.
+
+Reproduz em ordem os snapshots gravados por `FonteGravacao` (ver `fontes_dados.py`)
+e mede, para cada um, as etapas do ciclo de `main()`: a consulta à fonte,
+`processar_dados`, índice de busca, agregações e geração do HTML dos cards. Com
+`--simular-latencia` a consulta demora o mesmo que a consulta gravada. O relógio usado é o instante em que
+o snapshot foi gravado, então os tempos em aberto e a janela de 7 dias saem iguais
+aos da produção e duas execuções sobre a mesma gravação são comparáveis.
+
+Exemplos:
+    python perfil_reproducao.py gravacoes/dia1
+    python perfil_reproducao.py gravacoes/dia1 --limite 200 --cprofile --top 30
+    python perfil_reproducao.py gravacoes/dia1 --json perfil.json
+    python perfil_reproducao.py gravacoes/dia1 --repetir --limite 5000 --simular-latencia
+"""
+import argparse
+import cProfile
+import json
+import pstats
+import sys
+import time
+
+import numpy as np
+
+import app
+from fontes_dados import FonteReproducao
+from indice_busca import IndiceOrdensServico
+
+ETAPAS = ['consulta', 'processar_dados', 'indice_busca', 'agregacao', 'renderizacao']
+
+
+def executar_ciclo(df_raw, agora, indice, tempos):
+    """Mesmas etapas do loop de `main()`, acumulando a duração de cada uma em `tempos`."""
+    inicio = time.perf_counter()
+    df_processed = app.processar_dados(df_raw, agora)
+    tempos['processar_dados'].append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    indice.atualizar(df_processed)
+    tempos['indice_busca'].append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    os_aguardando_inicio = app.filtrar_os_aguardando_inicio(df_processed)
+    carga_por_responsavel, best_performer_name = app.calcular_carga_por_responsavel(df_processed, agora)
+    detalhes = None
+    if best_performer_name is not None:
+        # Os detalhes abertos costumam ser os do responsável em destaque
+        detalhes = app.filtrar_detalhes_responsavel(df_processed, best_performer_name, agora)
+    tempos['agregacao'].append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    app.generate_open_os_cards(os_aguardando_inicio)
+    if detalhes is not None:
+        app.generate_os_details_cards(detalhes[0], card_type="active")
+        app.generate_os_details_cards(detalhes[1], card_type="completed")
+    tempos['renderizacao'].append(time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil do ciclo do painel sobre uma gravação de snapshots.")
+    parser.add_argument('diretorio', help="Diretório gravado por FonteGravacao")
+    parser.add_argument('--limite', type=int, help="Reproduz apenas os N primeiros registros")
+    parser.add_argument('--repetir', action='store_true',
+                        help="Recomeça a gravação ao chegar ao fim (use com --limite para mais ciclos que registros)")
+    parser.add_argument('--simular-latencia', action='store_true',
+                        help="Cada consulta espera o tempo que a consulta original levou")
+    parser.add_argument('--cprofile', action='store_true', help="Mostra também as funções mais custosas (cProfile)")
+    parser.add_argument('--top', type=int, default=25, help="Quantidade de funções listadas pelo cProfile")
+    parser.add_argument('--json', help="Grava o resumo por etapa neste arquivo JSON")
+    args = parser.parse_args()
+
+    fonte = FonteReproducao(args.diretorio, repetir=args.repetir, simular_latencia=args.simular_latencia)
+    if args.limite:
+        total = args.limite if args.repetir else min(len(fonte), args.limite)
+    else:
+        total = len(fonte)
+    indice = IndiceOrdensServico()
+    tempos = {etapa: [] for etapa in ETAPAS}
+    linhas = []
+
+    perfil = cProfile.Profile() if args.cprofile else None
+    for _ in range(total):
+        inicio = time.perf_counter()
+        df_raw = fonte.obter_ordens_servico()
+        tempos['consulta'].append(time.perf_counter() - inicio)
+        linhas.append(len(df_raw))
+        if perfil:
+            perfil.enable()
+        executar_ciclo(df_raw, fonte.instante_atual, indice, tempos)
+        if perfil:
+            perfil.disable()
+
+    print(f"{total} snapshots reproduzidos de {args.diretorio} ({min(linhas)}-{max(linhas)} linhas)")
+    resumo = {}
+    for etapa in ETAPAS:
+        valores_ms = np.array(tempos[etapa]) * 1000
+        resumo[etapa] = {
+            'p50_ms': float(np.percentile(valores_ms, 50)),
+            'p90_ms': float(np.percentile(valores_ms, 90)),
+            'p99_ms': float(np.percentile(valores_ms, 99)),
+            'max_ms': float(valores_ms.max()),
+            'total_ms': float(valores_ms.sum()),
+        }
+        print(f"{etapa:<16} p50 {resumo[etapa]['p50_ms']:8.2f} ms | p90 {resumo[etapa]['p90_ms']:8.2f} ms | "
+              f"p99 {resumo[etapa]['p99_ms']:8.2f} ms | máx {resumo[etapa]['max_ms']:8.2f} ms | "
+              f"total {resumo[etapa]['total_ms'] / 1000:.2f} s")
+
+    if perfil:
+        print()
+        pstats.Stats(perfil, stream=sys.stdout).sort_stats('cumulative').print_stats(args.top)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as arquivo:
+            json.dump(resumo, arquivo, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import json
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+import dados_simulados
+from fontes_dados import ARQUIVO_MANIFESTO, FonteGravacao, FonteReproducao, FonteSimulada
+
+
+class BancoParado(dados_simulados.BancoSimulado):
+    """Banco simulado cujo relógio só anda quando o teste manda."""
+
+    def __init__(self, agora):
+        super().__init__(dias_historico=3, os_por_dia=25, agora=agora)
+        self.agora = agora
+
+    def consultar(self, agora=None):
+        return super().consultar(agora or self.agora)
+
+
+@pytest.fixture
+def banco(monkeypatch):
+    banco = BancoParado(datetime(2024, 3, 1, 8, 0))
+    monkeypatch.setattr(dados_simulados, '_banco', banco)
+    return banco
+
+
+def gravar(diretorio, banco):
+    """Três consultas iguais e uma depois de um dia; devolve os dois resultados distintos."""
+    gravador = FonteGravacao(FonteSimulada(), str(diretorio))
+    primeiro = [gravador.obter_ordens_servico() for _ in range(3)][0]
+    banco.agora += timedelta(days=1)
+    segundo = gravador.obter_ordens_servico()
+    return primeiro, segundo
+
+
+def ler_manifesto(diretorio):
+    with open(diretorio / ARQUIVO_MANIFESTO, encoding='utf-8') as manifesto:
+        return [json.loads(linha) for linha in manifesto]
+
+
+def test_gravacao_so_grava_snapshot_quando_o_resultado_muda(tmp_path, banco):
+    primeiro, segundo = gravar(tmp_path, banco)
+
+    assert len(segundo) > len(primeiro)
+    assert sorted(p.name for p in tmp_path.glob('snapshot_*.pkl.gz')) == \
+        ['snapshot_000001.pkl.gz', 'snapshot_000002.pkl.gz']
+    registros = ler_manifesto(tmp_path)
+    assert [r['arquivo'] for r in registros] == ['snapshot_000001.pkl.gz'] * 3 + ['snapshot_000002.pkl.gz']
+    assert [r['linhas'] for r in registros] == [len(primeiro)] * 3 + [len(segundo)]
+
+
+def test_reproducao_em_ordem_para_no_ultimo_registro(tmp_path, banco):
+    primeiro, segundo = gravar(tmp_path, banco)
+    fonte = FonteReproducao(str(tmp_path))
+    esperados = [primeiro, primeiro, primeiro, segundo, segundo, segundo]
+
+    assert len(fonte) == 4
+    for esperado in esperados:
+        pd.testing.assert_frame_equal(fonte.obter_ordens_servico(), esperado)
+    assert fonte.instante_atual == fonte.registros[-1]['instante']
+
+
+def test_reproducao_com_repeticao_recomeca_a_gravacao(tmp_path, banco):
+    primeiro, segundo = gravar(tmp_path, banco)
+    fonte = FonteReproducao(str(tmp_path), repetir=True)
+
+    for _ in range(4):
+        fonte.obter_ordens_servico()
+    pd.testing.assert_frame_equal(fonte.obter_ordens_servico(), primeiro)
+    assert fonte.instante_atual == fonte.registros[0]['instante']
+
+
+def test_reproducao_devolve_copia_do_snapshot(tmp_path, banco):
+    primeiro, _ = gravar(tmp_path, banco)
+    fonte = FonteReproducao(str(tmp_path))
+
+    df = fonte.obter_ordens_servico()
+    df['NR_OS'] = 0 # processar_dados altera o DataFrame recebido
+    pd.testing.assert_frame_equal(fonte.obter_ordens_servico(), primeiro)
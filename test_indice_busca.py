@@ -0,0 +1,85 @@
+import pandas as pd
+
+from indice_busca import IndiceOrdensServico
+
+
+def snapshot(*linhas):
+    """DataFrame no formato de `processar_dados` com só as colunas que o índice usa."""
+    colunas = ['nr_os', 'ds_solicitacao', 'ds_completa_servico', 'nm_solicitante',
+               'ie_prioridade', 'status', 'nm_responsavel']
+    return pd.DataFrame(linhas, columns=colunas)
+
+
+def os_(nr_os, solicitacao, status='Em aberto', responsavel=None, solicitante='Ana Paula', prioridade='M'):
+    return (nr_os, solicitacao, f"{solicitacao} no setor", solicitante, prioridade, status, responsavel)
+
+
+def test_busca_sem_acentos_e_por_prefixo():
+    indice = IndiceOrdensServico()
+    indice.atualizar(snapshot(
+        os_(1, 'Manutenção da autoclave'),
+        os_(2, 'Troca de lâmpada', solicitante='João Batista', prioridade='A'),
+    ))
+
+    assert indice.buscar(texto='MANUTENCAO') == [1]
+    assert indice.buscar(texto='lamp') == [2]
+    assert indice.buscar(texto='lâmpada troca') == [2]
+    assert indice.buscar(solicitante='joao') == [2]
+    assert indice.buscar(prioridades=['a']) == [2]
+    assert indice.buscar() == [2, 1]
+
+
+def test_texto_so_com_stopwords_nao_retorna_todo_o_historico():
+    indice = IndiceOrdensServico()
+    indice.atualizar(snapshot(
+        os_(1, 'Porta com defeito'),
+        os_(2, 'Vazamento na pia'),
+    ))
+
+    # "de" a caminho de "defeito": o último termo casa por prefixo
+    assert indice.buscar(texto='de') == [1]
+    assert indice.buscar(texto='  --  ') == []
+
+
+def test_stopword_no_fim_da_busca_e_ignorada():
+    indice = IndiceOrdensServico()
+    indice.atualizar(snapshot(
+        os_(1, 'Troca de lâmpada', solicitante='Ana da Silva'),
+        os_(2, 'Conserto de maca', solicitante='João Batista'),
+    ))
+
+    assert indice.buscar(texto='troca de') == [1]
+    assert indice.buscar(texto='conserto de') == [2]
+    assert indice.buscar(solicitante='ana da') == [1]
+
+
+def test_atualizacao_incremental_de_os_novas_alteradas_e_removidas():
+    indice = IndiceOrdensServico()
+    assert indice.atualizar(snapshot(
+        os_(1, 'Troca de lâmpada'),
+        os_(2, 'Porta emperrada'),
+        os_(3, 'Tomada sem energia'),
+    )) == 3
+
+    # OS 1 iniciada, OS 2 removida, OS 4 nova; OS 3 sem mudança não é reindexada
+    alteradas = indice.atualizar(snapshot(
+        os_(1, 'Troca de lâmpada', status='Em andamento', responsavel='jsilva'),
+        os_(3, 'Tomada sem energia'),
+        os_(4, 'Porta de vidro quebrada'),
+    ))
+
+    assert alteradas == 3
+    assert len(indice) == 3
+    assert indice.buscar(texto='emperrada') == []
+    assert indice.buscar(texto='porta') == [4]
+    assert indice.buscar(status=['Em aberto']) == [4, 3]
+    assert indice.buscar(status=['Em andamento'], responsavel='JSILVA') == [1]
+    assert indice.responsaveis() == ['jsilva']
+
+
+def test_mesmo_snapshot_nao_e_reprocessado():
+    indice = IndiceOrdensServico()
+    df = snapshot(os_(1, 'Troca de lâmpada'))
+
+    assert indice.atualizar(df) == 1
+    assert indice.atualizar(df) == 0
@@ -0,0 +1,399 @@
+"""Teste de carga do painel de TV com vários visualizadores simultâneos.
+
+Sobe um servidor Streamlit com o app usando a fonte de dados simulada
+(ver `dados_simulados.py`) e abre N sessões "headless" que falam o protocolo
+websocket do Streamlit diretamente, sem navegador. Cada sessão acompanha os
+ciclos de atualização do painel e, de vez em quando, clica em "Ver Detalhes"
+como um operador faria.
+
+Ao final é impresso um relatório com CPU e memória do servidor, percentis da
+latência de atualização, atraso do ciclo em relação ao intervalo configurado,
+latência dos cliques e bytes trafegados no websocket por sessão.
+
+Exemplos:
+    python teste_carga.py --sessoes 20 --duracao 300
+    python teste_carga.py --sessoes 50 --intervalo 10 --latencia-banco 2 --json resultado.json
+    python teste_carga.py --url http://painel:8501 --pid 1234 --sessoes 10
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from tornado.websocket import websocket_connect
+
+try:
+    import psutil
+except ImportError:  # Opcional: sem psutil o relatório não traz CPU e memória do servidor
+    psutil = None
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+# Caminhos do Streamlit: versões novas usam o prefixo /_stcore, as antigas não
+CAMINHOS_SAUDE = ['/_stcore/health', '/healthz']
+CAMINHOS_WEBSOCKET = ['/_stcore/stream', '/stream']
+
+# Execuções do script esperadas após um clique em "Ver Detalhes" (a do botão e a do rerun)
+EXECUCOES_POR_CLIQUE = 2
+
+
+def percentil(valores, p):
+    """Percentil `p` (0-100) pelo método do posto mais próximo."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    posicao = max(1, math.ceil(p / 100 * len(ordenados)))
+    return ordenados[posicao - 1]
+
+
+# --- Sessão headless ---
+class SessaoVirtual:
+    """Uma "TV" conectada ao painel, registrando tempos e bytes do websocket."""
+
+    def __init__(self, id_sessao, url_ws, intervalo, prob_clique, rng):
+        self.id_sessao = id_sessao
+        self.url_ws = url_ws
+        self.intervalo = intervalo
+        self.prob_clique = prob_clique
+        self.rng = rng
+
+        self.conectada = False
+        self.erro = None
+        self.bytes_recebidos = 0
+        self.bytes_enviados = 0
+        self.ciclos = 0
+        self.botoes_vistos = 0 # Botões "Ver Detalhes" recebidos; zero significa que nenhum clique foi possível
+        self.latencias_atualizacao = [] # Início do ciclo até o último elemento renderizado
+        self.periodos_ciclo = [] # Tempo entre o início de dois ciclos automáticos consecutivos (sem cliques)
+        self.latencias_clique = [] # Clique em "Ver Detalhes" até a seção de detalhes aparecer
+
+        self._conn = None
+        self._inicio_ciclo = None
+        self._ultimo_delta = None
+        self._botoes = [] # IDs dos botões "Ver Detalhes" do ciclo atual
+        self._clicar_em = None
+        self._clique_enviado_em = None
+        self._execucoes_do_clique = 0 # Quantas execuções seguidas já foram disparadas pelo clique atual
+
+    async def _enviar_rerun(self, id_botao=None):
+        """Pede uma nova execução do script, como o navegador faz ao conectar ou clicar."""
+        msg = BackMsg()
+        msg.rerun_script.SetInParent()
+        msg.rerun_script.query_string = ''
+        if id_botao:
+            widget = msg.rerun_script.widget_states.widgets.add()
+            widget.id = id_botao
+            widget.trigger_value = True
+        dados = msg.SerializeToString()
+        self.bytes_enviados += len(dados)
+        await self._conn.write_message(dados, binary=True)
+
+    def _fechar_ciclo(self, agora, interrompido):
+        """Registra a execução que terminou; `interrompido` indica que um clique a encerrou antes do tempo."""
+        if self._inicio_ciclo is None:
+            return
+        # Execuções encurtadas ou deslocadas por cliques não refletem o ciclo automático
+        if not interrompido and not self._execucoes_do_clique:
+            self.periodos_ciclo.append(agora - self._inicio_ciclo)
+        if self._ultimo_delta is not None:
+            self.latencias_atualizacao.append(self._ultimo_delta - self._inicio_ciclo)
+
+    def _tratar_mensagem(self, dados, agora):
+        self.bytes_recebidos += len(dados)
+        msg = ForwardMsg()
+        msg.ParseFromString(dados)
+        tipo = msg.WhichOneof('type')
+
+        if tipo == 'new_session':
+            # Cada execução do script (inclusive via st.experimental_rerun) começa com new_session
+            clique_pendente = self._clique_enviado_em is not None
+            self._fechar_ciclo(agora, interrompido=clique_pendente and not self._execucoes_do_clique)
+            if clique_pendente:
+                # O clique dispara uma execução que chama st.experimental_rerun(); os detalhes
+                # aparecem na seguinte. Se nem assim aparecerem, a medição é descartada.
+                self._execucoes_do_clique += 1
+                if self._execucoes_do_clique > EXECUCOES_POR_CLIQUE:
+                    self._clique_enviado_em = None
+                    self._execucoes_do_clique = 0
+            else:
+                self._execucoes_do_clique = 0
+            self.ciclos += 1
+            self._inicio_ciclo = agora
+            self._ultimo_delta = None
+            self._botoes = []
+            if self._clicar_em is None and self._clique_enviado_em is None \
+                    and self.rng.random() < self.prob_clique:
+                self._clicar_em = agora + self.rng.uniform(1, max(1, self.intervalo / 2))
+        elif tipo in ('delta', 'ref_hash'):
+            self._ultimo_delta = agora
+            if tipo == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                elemento = msg.delta.new_element
+                tipo_elemento = elemento.WhichOneof('type')
+                if tipo_elemento == 'button':
+                    self._botoes.append(elemento.button.id)
+                    self.botoes_vistos += 1
+                elif tipo_elemento == 'markdown' and self._execucoes_do_clique and self._clique_enviado_em is not None \
+                        and 'Detalhes para' in elemento.markdown.body:
+                    # Só vale a partir da execução disparada pelo clique: com um responsável já
+                    # selecionado, as execuções anteriores também mostram "Detalhes para"
+                    self.latencias_clique.append(agora - self._clique_enviado_em)
+                    self._clique_enviado_em = None
+
+    async def executar(self, fim):
+        for caminho in CAMINHOS_WEBSOCKET:
+            try:
+                self._conn = await websocket_connect(self.url_ws + caminho, max_message_size=256 * 1024 * 1024)
+                break
+            except Exception as e:
+                self.erro = f"Falha ao conectar: {e}"
+        if self._conn is None:
+            return
+        self.conectada = True
+        self.erro = None
+
+        try:
+            await self._enviar_rerun()
+            while True:
+                agora = time.monotonic()
+                if agora >= fim:
+                    break
+                if self._clicar_em is not None and agora >= self._clicar_em and self._botoes:
+                    self._clicar_em = None
+                    self._clique_enviado_em = agora
+                    await self._enviar_rerun(self.rng.choice(self._botoes))
+                    continue
+
+                espera = fim - agora
+                if self._clicar_em is not None:
+                    espera = max(0.05, min(espera, self._clicar_em - agora))
+                try:
+                    dados = await asyncio.wait_for(self._conn.read_message(), timeout=espera)
+                except asyncio.TimeoutError:
+                    continue
+                if dados is None:
+                    self.erro = "Conexão encerrada pelo servidor"
+                    break
+                self._tratar_mensagem(dados, time.monotonic())
+        except Exception as e:
+            self.erro = f"{type(e).__name__}: {e}"
+        finally:
+            self._conn.close()
+
+
+# --- Monitoramento do servidor ---
+class MonitorServidor:
+    """Amostra CPU e RSS do processo do servidor (e filhos) a cada segundo."""
+
+    def __init__(self, pid):
+        self.amostras_cpu = []
+        self.amostras_rss_mb = []
+        self._processo = psutil.Process(pid) if psutil and pid else None
+
+    def _processos(self):
+        try:
+            return [self._processo] + self._processo.children(recursive=True)
+        except psutil.Error:
+            return []
+
+    async def executar(self, fim):
+        if self._processo is None:
+            return
+        for proc in self._processos():
+            proc.cpu_percent(None) # A primeira leitura só define a referência
+        while time.monotonic() < fim:
+            await asyncio.sleep(1)
+            cpu = rss = 0.0
+            for proc in self._processos():
+                try:
+                    cpu += proc.cpu_percent(None)
+                    rss += proc.memory_info().rss
+                except psutil.Error:
+                    pass
+            self.amostras_cpu.append(cpu)
+            self.amostras_rss_mb.append(rss / (1024 * 1024))
+
+
+# --- Servidor Streamlit ---
+def aguardar_servidor(url, timeout=60):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        for caminho in CAMINHOS_SAUDE:
+            try:
+                with urllib.request.urlopen(url + caminho, timeout=2) as resposta:
+                    if resposta.status == 200:
+                        return True
+            except Exception:
+                pass
+        time.sleep(0.5)
+    return False
+
+
+def iniciar_servidor(args):
+    """Sobe o app com a fonte simulada numa porta local e retorna o processo."""
+    env = dict(os.environ)
+    env.update({
+        'PY_MAN_FONTE_DADOS': 'simulada',
+        'PY_MAN_INTERVALO_ATUALIZACAO': str(args.intervalo),
+        'PY_MAN_SIMULADA_DIAS_HISTORICO': str(args.dias_historico),
+        'PY_MAN_SIMULADA_OS_POR_DIA': str(args.os_por_dia),
+        'PY_MAN_SIMULADA_LATENCIA': str(args.latencia_banco),
+        'PY_MAN_SIMULADA_SEMENTE': str(args.semente),
+    })
+    comando = [
+        sys.executable, '-m', 'streamlit', 'run', APP,
+        '--server.headless', 'true',
+        '--server.port', str(args.porta),
+        '--browser.gatherUsageStats', 'false',
+    ]
+    return subprocess.Popen(comando, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def executar_carga(args, url, pid):
+    url_ws = url.replace('http://', 'ws://').replace('https://', 'wss://')
+    fim = time.monotonic() + args.rampa + args.duracao
+    rng = random.Random(args.semente)
+    sessoes = [
+        SessaoVirtual(i, url_ws, args.intervalo, args.prob_clique, random.Random(rng.random()))
+        for i in range(args.sessoes)
+    ]
+    monitor = MonitorServidor(pid)
+
+    async def iniciar_sessao(sessao):
+        # Espalha as conexões ao longo da rampa para não abrir todas no mesmo instante
+        if args.sessoes > 1:
+            await asyncio.sleep(args.rampa * sessao.id_sessao / (args.sessoes - 1))
+        await sessao.executar(fim)
+
+    await asyncio.gather(monitor.executar(fim), *(iniciar_sessao(s) for s in sessoes))
+    return sessoes, monitor
+
+
+# --- Relatório ---
+def montar_relatorio(args, sessoes, monitor):
+    def resumo(valores):
+        return {
+            'n': len(valores),
+            'p50': percentil(valores, 50),
+            'p90': percentil(valores, 90),
+            'p99': percentil(valores, 99),
+            'max': max(valores) if valores else None,
+        }
+
+    latencias = [v for s in sessoes for v in s.latencias_atualizacao]
+    periodos = [v for s in sessoes for v in s.periodos_ciclo]
+    cliques = [v for s in sessoes for v in s.latencias_clique]
+    conectadas = [s for s in sessoes if s.conectada]
+    ciclos = sum(s.ciclos for s in conectadas)
+
+    relatorio = {
+        'sessoes': args.sessoes,
+        'sessoes_conectadas': len(conectadas),
+        'sessoes_com_erro': sum(1 for s in sessoes if s.erro),
+        'erros': sorted({s.erro for s in sessoes if s.erro}),
+        'prob_clique': args.prob_clique,
+        'botoes_vistos': sum(s.botoes_vistos for s in sessoes),
+        'duracao_s': args.duracao,
+        'intervalo_s': args.intervalo,
+        'latencia_atualizacao_s': resumo(latencias),
+        'periodo_ciclo_s': resumo(periodos),
+        'latencia_clique_s': resumo(cliques),
+        'bytes_recebidos_por_sessao': (sum(s.bytes_recebidos for s in conectadas) / len(conectadas)) if conectadas else 0,
+        'bytes_enviados_por_sessao': (sum(s.bytes_enviados for s in conectadas) / len(conectadas)) if conectadas else 0,
+        'bytes_recebidos_por_ciclo': (sum(s.bytes_recebidos for s in conectadas) / ciclos) if ciclos else 0,
+    }
+    if monitor.amostras_cpu:
+        relatorio['servidor'] = {
+            'cpu_medio_pct': sum(monitor.amostras_cpu) / len(monitor.amostras_cpu),
+            'cpu_max_pct': max(monitor.amostras_cpu),
+            'rss_medio_mb': sum(monitor.amostras_rss_mb) / len(monitor.amostras_rss_mb),
+            'rss_max_mb': max(monitor.amostras_rss_mb),
+        }
+    return relatorio
+
+
+def imprimir_relatorio(relatorio):
+    def linha(titulo, resumo):
+        if not resumo['n']:
+            return f"{titulo:<32} sem amostras"
+        return (f"{titulo:<32} p50 {resumo['p50']:.3f} | p90 {resumo['p90']:.3f} | "
+                f"p99 {resumo['p99']:.3f} | máx {resumo['max']:.3f} (n={resumo['n']})")
+
+    print(f"Sessões: {relatorio['sessoes']} ({relatorio['sessoes_conectadas']} conectadas, "
+          f"{relatorio['sessoes_com_erro']} com erro) | duração: {relatorio['duracao_s']}s | "
+          f"intervalo: {relatorio['intervalo_s']}s")
+    for erro in relatorio['erros']:
+        print(f"  erro: {erro}")
+    if relatorio['prob_clique'] > 0 and not relatorio['botoes_vistos']:
+        print("AVISO: nenhum botão 'Ver Detalhes' foi recebido; o padrão de cliques não foi exercitado", file=sys.stderr)
+    if 'servidor' in relatorio:
+        srv = relatorio['servidor']
+        print(f"Servidor: CPU médio {srv['cpu_medio_pct']:.1f}% | máx {srv['cpu_max_pct']:.1f}% | "
+              f"RSS médio {srv['rss_medio_mb']:.1f} MB | máx {srv['rss_max_mb']:.1f} MB")
+    else:
+        print("Servidor: CPU/memória indisponíveis (instale psutil e informe --pid ao usar --url)")
+    print(linha("Latência de atualização (s)", relatorio['latencia_atualizacao_s']))
+    print(linha("Período do ciclo (s)", relatorio['periodo_ciclo_s']))
+    periodo_p99 = relatorio['periodo_ciclo_s']['p99']
+    if periodo_p99 is not None:
+        print(f"{'Atraso do ciclo p99 (s)':<32} {periodo_p99 - relatorio['intervalo_s']:.3f}")
+    print(linha("Latência do clique (s)", relatorio['latencia_clique_s']))
+    print(f"Websocket por sessão: recebidos {relatorio['bytes_recebidos_por_sessao'] / 1024:.1f} KB "
+          f"({relatorio['bytes_recebidos_por_ciclo'] / 1024:.1f} KB/ciclo) | "
+          f"enviados {relatorio['bytes_enviados_por_sessao'] / 1024:.1f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do painel de OS com sessões headless.")
+    parser.add_argument('--sessoes', type=int, default=10, help="Número de TVs simultâneas")
+    parser.add_argument('--duracao', type=float, default=300, help="Duração da medição em segundos (após a rampa)")
+    parser.add_argument('--rampa', type=float, default=10, help="Segundos para abrir todas as sessões")
+    parser.add_argument('--intervalo', type=float, default=30, help="Intervalo de atualização do painel em segundos")
+    parser.add_argument('--prob-clique', type=float, default=0.1, help="Probabilidade de clicar em 'Ver Detalhes' a cada ciclo")
+    parser.add_argument('--porta', type=int, default=8599, help="Porta do servidor iniciado pelo teste")
+    parser.add_argument('--url', help="Usa um servidor já em execução em vez de iniciar um")
+    parser.add_argument('--pid', type=int, help="PID do servidor informado em --url (para CPU/memória)")
+    parser.add_argument('--dias-historico', type=int, default=365, help="Dias de histórico no banco simulado")
+    parser.add_argument('--os-por-dia', type=float, default=25, help="OS criadas por dia no banco simulado")
+    parser.add_argument('--latencia-banco', type=float, default=0.0, help="Segundos gastos em cada consulta simulada")
+    parser.add_argument('--semente', type=int, default=42, help="Semente dos sorteios (dados e cliques)")
+    parser.add_argument('--json', help="Grava o relatório também neste arquivo JSON")
+    args = parser.parse_args()
+
+    servidor = None
+    if args.url:
+        url, pid = args.url.rstrip('/'), args.pid
+    else:
+        servidor = iniciar_servidor(args)
+        url, pid = f"http://localhost:{args.porta}", servidor.pid
+
+    try:
+        if not aguardar_servidor(url):
+            print(f"Servidor não respondeu em {url}", file=sys.stderr)
+            return 1
+        sessoes, monitor = asyncio.run(executar_carga(args, url, pid))
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait(timeout=30)
+
+    relatorio = montar_relatorio(args, sessoes, monitor)
+    imprimir_relatorio(relatorio)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    # Sem botões a medição de cliques não aconteceu: o resultado não representa o uso real
+    if args.prob_clique > 0 and not relatorio['botoes_vistos']:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
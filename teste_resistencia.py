@@ -0,0 +1,132 @@
+"""Teste de resistência (soak) de memória do ciclo de atualização do painel.
+
+Simula dias de ciclos sem esperar por eles: a cada ciclo consulta o banco simulado
+num relógio que avança `--intervalo` segundos, roda `processar_dados`, os filtros
+e agregações do painel e gera o HTML dos cards, exatamente como o loop de `main()`,
+mas sem o `time.sleep` e sem o servidor Streamlit. A memória é amostrada pelo
+`MonitorMemoria` e, no fim, o teste informa a tendência de crescimento (MB/dia)
+e os pontos do código que mais cresceram.
+
+Com o tracemalloc ligado cada ciclo leva cerca de 0,08s com 365 dias de histórico,
+ou seja, ≈4 min por dia simulado (o padrão de `--dias 3` leva ≈12 min).
+
+Retorna código de saída 1 quando o crescimento passa de `--limite-crescimento-mb`
+por dia simulado, servindo de trava contra vazamentos antes de publicar mudanças.
+O crescimento dentro do próprio servidor Streamlit (deltas, sessões) deve ser
+observado rodando o app com PY_MAN_MONITOR_MEMORIA=1 junto com o teste_carga.py.
+
+Exemplo:
+    python teste_resistencia.py --dias 7 --orcamento-mb 500 --limite-crescimento-mb 5
+"""
+import argparse
+import logging
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import app
+import dados_simulados
+from indice_busca import IndiceOrdensServico
+from monitor_memoria import MonitorMemoria
+
+
+def executar_ciclo(banco, agora, indice, rng):
+    """Um ciclo do painel: consulta, processamento, índice de busca, agregações e HTML dos cards."""
+    df_processed = app.processar_dados(banco.consultar(agora), agora)
+    indice.atualizar(df_processed)
+    os_aguardando_inicio = app.filtrar_os_aguardando_inicio(df_processed)
+    html = app.generate_open_os_cards(os_aguardando_inicio)
+
+    carga_por_responsavel, _ = app.calcular_carga_por_responsavel(df_processed, agora)
+    if not carga_por_responsavel.empty:
+        # Simula um operador que deixou os detalhes de algum responsável abertos
+        responsavel = rng.choice(list(carga_por_responsavel["Responsável"]))
+        ativas, concluidas = app.filtrar_detalhes_responsavel(df_processed, responsavel, agora)
+        html += app.generate_os_details_cards(ativas, card_type="active")
+        html += app.generate_os_details_cards(concluidas, card_type="completed")
+    return len(html)
+
+
+def tendencia_por_dia(amostras, campo):
+    """Inclinação (MB por dia simulado) da reta de mínimos quadrados sobre as amostras."""
+    pontos = [(a['instante'], a[campo]) for a in amostras if a[campo] is not None]
+    if len(pontos) < 2:
+        return 0.0
+    media_x = sum(x for x, _ in pontos) / len(pontos)
+    media_y = sum(y for _, y in pontos) / len(pontos)
+    variancia = sum((x - media_x) ** 2 for x, _ in pontos)
+    if not variancia:
+        return 0.0
+    covariancia = sum((x - media_x) * (y - media_y) for x, y in pontos)
+    return covariancia / variancia * 24 * 60 * 60
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de resistência de memória do ciclo do painel.")
+    parser.add_argument('--dias', type=float, default=3, help="Dias simulados")
+    parser.add_argument('--intervalo', type=float, default=30, help="Segundos simulados entre ciclos")
+    parser.add_argument('--amostrar-a-cada', type=int, default=20, help="Ciclos entre amostras de memória")
+    parser.add_argument('--aquecimento', type=int, default=50, help="Ciclos antes de fixar a linha de base")
+    parser.add_argument('--orcamento-mb', type=float, help="Orçamento de RSS; ao exceder, loga os maiores crescimentos")
+    parser.add_argument('--limite-crescimento-mb', type=float, default=10,
+                        help="Crescimento máximo aceito de memória rastreada por dia simulado")
+    parser.add_argument('--dias-historico', type=int, default=365, help="Dias de histórico no banco simulado")
+    parser.add_argument('--os-por-dia', type=float, default=25, help="OS criadas por dia no banco simulado")
+    parser.add_argument('--semente', type=int, default=42, help="Semente dos sorteios")
+    parser.add_argument('--quadros', type=int, default=1,
+                        help="Profundidade de pilha do tracemalloc (mais quadros deixam cada ciclo bem mais lento)")
+    parser.add_argument('--csv', help="Grava as amostras de memória neste arquivo CSV")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    inicio_simulado = datetime.now()
+    banco = dados_simulados.BancoSimulado(
+        dias_historico=args.dias_historico, os_por_dia=args.os_por_dia,
+        semente=args.semente, agora=inicio_simulado,
+    )
+    indice = IndiceOrdensServico()
+    rng = random.Random(args.semente)
+    monitor = MonitorMemoria(orcamento_mb=args.orcamento_mb, quadros=args.quadros, arquivo_csv=args.csv).iniciar()
+
+    total_ciclos = int(args.dias * 24 * 60 * 60 / args.intervalo)
+    inicio_real = time.monotonic()
+    for ciclo in range(total_ciclos):
+        agora = inicio_simulado + timedelta(seconds=ciclo * args.intervalo)
+        executar_ciclo(banco, agora, indice, rng)
+
+        if ciclo == args.aquecimento:
+            # Caches do pandas e imports tardios estabilizam nos primeiros ciclos
+            monitor.redefinir_base()
+            monitor.amostras.clear()
+        if ciclo >= args.aquecimento and ciclo % args.amostrar_a_cada == 0:
+            # O instante da amostra é o do relógio simulado, para a tendência sair em MB/dia simulado
+            amostra = monitor.amostrar(instante=agora.timestamp())
+            print(f"ciclo {ciclo}/{total_ciclos} ({agora:%d/%m %H:%M}): RSS {amostra['rss_mb'] or 0:.1f} MB | "
+                  f"rastreada {amostra['rastreada_mb']:.1f} MB", flush=True)
+
+    duracao_real = time.monotonic() - inicio_real
+    amostras = list(monitor.amostras)
+    crescimento_rastreada = tendencia_por_dia(amostras, 'rastreada_mb')
+    crescimento_rss = tendencia_por_dia(amostras, 'rss_mb')
+
+    print()
+    print(f"{total_ciclos} ciclos ({args.dias:g} dias simulados) em {duracao_real:.1f}s reais")
+    if amostras:
+        print(f"RSS: {amostras[0]['rss_mb'] or 0:.1f} MB -> {amostras[-1]['rss_mb'] or 0:.1f} MB "
+              f"(tendência {crescimento_rss:+.2f} MB/dia)")
+        print(f"Memória rastreada: {amostras[0]['rastreada_mb']:.1f} MB -> {amostras[-1]['rastreada_mb']:.1f} MB "
+              f"(tendência {crescimento_rastreada:+.2f} MB/dia)")
+    print("Maiores crescimentos desde a linha de base:")
+    print(monitor.formatar_crescimentos())
+
+    if crescimento_rastreada > args.limite_crescimento_mb:
+        print(f"FALHA: crescimento de {crescimento_rastreada:.2f} MB/dia acima do limite de "
+              f"{args.limite_crescimento_mb:g} MB/dia", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())